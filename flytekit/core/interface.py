@@ -279,6 +279,64 @@ def _change_unrecognized_type_to_pickle(t: Type[T]) -> typing.Union[Tuple[Type[T
     return t
 
 
+# Resolved type hints, keyed on the annotations they were resolved from, see _get_type_hints.
+_type_hints_cache: Dict[tuple, Dict[str, Any]] = {}
+_TYPE_HINTS_CACHE_SIZE = 1024
+
+
+def _has_forward_refs(t: Any) -> bool:
+    if isinstance(t, (str, typing.ForwardRef)):
+        return True
+    if get_origin(t) is Annotated:
+        # Only the annotated type is evaluated, the metadata is kept as is.
+        return _has_forward_refs(get_args(t)[0])
+    return any(_has_forward_refs(arg) for arg in get_args(t))
+
+
+def _type_hints_key(fn: typing.Callable) -> Optional[tuple]:
+    """
+    Returns the cache key for the type hints of a plain function, or None if they cannot be cached.
+
+    Without forward references, the resolved hints only depend on the annotation objects themselves, plus which
+    parameters default to None (some get_type_hints versions turn those into Optional). String annotations, e.g. with
+    ``from __future__ import annotations``, are evaluated in the function's module and could resolve differently once
+    a name there is rebound, so those functions are not cached. The key holds neither the function nor its globals.
+    """
+    if not inspect.isfunction(fn):
+        return None
+    annotations = fn.__annotations__
+    if any(_has_forward_refs(t) for t in annotations.values()):
+        return None
+    code = fn.__code__
+    positional = code.co_varnames[: code.co_argcount]
+    defaults = dict(zip(positional[len(positional) - len(fn.__defaults__ or ()) :], fn.__defaults__ or ()))
+    defaults.update(fn.__kwdefaults__ or {})
+    key = (tuple(annotations.items()), frozenset(k for k, v in defaults.items() if v is None))
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable annotations, e.g. Annotated with a dict
+        return None
+    return key
+
+
+def _get_type_hints(fn: typing.Callable) -> Dict[str, Any]:
+    """
+    get_type_hints re-evaluates every annotation on each call. The same function definition is often decorated many
+    times (e.g. tasks defined inside another function), so resolved hints are cached where that is safe.
+    """
+    key = _type_hints_key(fn)
+    if key is None:
+        return get_type_hints(fn, include_extras=True)
+    hints = _type_hints_cache.get(key)
+    if hints is None:
+        hints = get_type_hints(fn, include_extras=True)
+        if len(_type_hints_cache) >= _TYPE_HINTS_CACHE_SIZE:
+            _type_hints_cache.clear()
+        _type_hints_cache[key] = hints
+    return dict(hints)
+
+
 def transform_function_to_interface(fn: typing.Callable, docstring: Optional[Docstring] = None) -> Interface:
     """
     From the annotations on a task function that the user should have provided, and the output names they want to use
@@ -288,7 +346,7 @@ def transform_function_to_interface(fn: typing.Callable, docstring: Optional[Doc
 
     """
 
-    type_hints = get_type_hints(fn, include_extras=True)
+    type_hints = _get_type_hints(fn)
     signature = inspect.signature(fn)
     return_annotation = type_hints.get("return", None)
 
@@ -1,5 +1,5 @@
 from contextlib import contextmanager
-from typing import Union
+from typing import Callable, List, Union
 from unittest.mock import MagicMock
 
 from flytekit.core.base_task import PythonTask
@@ -8,6 +8,30 @@ from flytekit.core.workflow import WorkflowBase
 from flytekit.loggers import logger
 
 
+def _mock_stack(t: Union[PythonTask, WorkflowBase, ReferenceEntity]) -> List[Callable]:
+    """
+    Returns the stack of active mocks for the given entity. The first time an entity is mocked, its execute method is
+    replaced, once, by a dispatcher that calls the innermost active mock, or the original execute if none is active.
+    Entering and leaving a mock afterwards only adds to and removes from this stack.
+    """
+    dispatcher = t.__dict__.get("execute")
+    stack = getattr(dispatcher, "_mock_stack", None)
+    if stack is not None:
+        return stack
+
+    stack = []
+    original = t.execute
+
+    def _dispatch(*args, **kwargs):
+        if stack:
+            return stack[-1](*args, **kwargs)
+        return original(*args, **kwargs)
+
+    _dispatch._mock_stack = stack
+    t.execute = _dispatch
+    return stack
+
+
 @contextmanager
 def task_mock(t: PythonTask) -> MagicMock:
     """
@@ -40,10 +64,12 @@ def task_mock(t: PythonTask) -> MagicMock:
         logger.warning(f"Invoking mock method for task: '{t.name}'")
         return m(*args, **kwargs)
 
-    _captured_fn = t.execute
-    t.execute = _log
-    yield m
-    t.execute = _captured_fn
+    stack = _mock_stack(t)
+    stack.append(_log)
+    try:
+        yield m
+    finally:
+        stack.remove(_log)
 
 
 def patch(target: Union[PythonTask, WorkflowBase, ReferenceEntity]):
@@ -67,11 +93,12 @@ def patch(target: Union[PythonTask, WorkflowBase, ReferenceEntity]):
         def new_test(*args, **kwargs):
             logger.warning(f"Invoking mock method for target: '{target.name}'")
             m = MagicMock()
-            saved = target.execute
-            target.execute = m
-            results = test_fn(m, *args, **kwargs)
-            target.execute = saved
-            return results
+            stack = _mock_stack(target)
+            stack.append(m)
+            try:
+                return test_fn(m, *args, **kwargs)
+            finally:
+                stack.remove(m)
 
         return new_test
 
@@ -1,3 +1,5 @@
+import weakref as _weakref
+
 from flyteidl.core import identifier_pb2 as _identifier_pb2
 
 from flytekit.models import common as _common_models
@@ -11,6 +13,26 @@ class ResourceType(object):
 
 
 class Identifier(_common_models.FlyteIdlEntity):
+    # Identifiers are immutable and the same ones are created over and over (references, registration, remote
+    # lookups), so live instances are interned on (class, resource_type, project, domain, name, version).
+    _pool = _weakref.WeakValueDictionary()
+
+    def __new__(cls, *args, **kwargs):
+        # Unpickling and copying call __new__ without arguments and fill in the state afterwards.
+        if not args and not kwargs:
+            return super().__new__(cls)
+        key = (cls, *cls._interning_key(*args, **kwargs))
+        existing = Identifier._pool.get(key)
+        if existing is not None:
+            return existing
+        obj = super().__new__(cls)
+        Identifier._pool[key] = obj
+        return obj
+
+    @staticmethod
+    def _interning_key(resource_type, project, domain, name, version):
+        return resource_type, project, domain, name, version
+
     def __init__(self, resource_type, project, domain, name, version):
         """
         :param int resource_type: enum value from ResourceType
@@ -90,6 +112,12 @@ class Identifier(_common_models.FlyteIdlEntity):
             version=p.version,
         )
 
+    def __eq__(self, other):
+        return self is other or super().__eq__(other)
+
+    def __hash__(self):
+        return super().__hash__()
+
     def __repr__(self):
         return self.__str__()
 
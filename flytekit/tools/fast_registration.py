@@ -4,6 +4,7 @@ import gzip
 import hashlib
 import os
 import posixpath
+import shutil
 import subprocess as _subprocess
 import tarfile
 import tempfile
@@ -18,6 +19,8 @@ from flytekit.tools.script_mode import tar_strip_file_attributes
 FAST_PREFIX = "fast"
 FAST_FILEENDING = ".tar.gz"
 
+_COPY_BUFFER_SIZE = 128 * 1024
+
 
 def fast_package(source: os.PathLike, output_dir: os.PathLike, deref_symlinks: bool = False) -> os.PathLike:
     """
@@ -44,7 +47,8 @@ def fast_package(source: os.PathLike, output_dir: os.PathLike, deref_symlinks: b
             tar.add(source, arcname="", filter=lambda x: ignore.tar_filter(tar_strip_file_attributes(x)))
         with gzip.GzipFile(filename=archive_fname, mode="wb", mtime=0) as gzipped:
             with open(tar_path, "rb") as tar_file:
-                gzipped.write(tar_file.read())
+                # Copy in chunks rather than loading the whole (possibly large) tar in memory at once.
+                shutil.copyfileobj(tar_file, gzipped, _COPY_BUFFER_SIZE)
 
     return archive_fname
 
@@ -1,11 +1,16 @@
+import contextlib
 import gzip
 import hashlib
 import importlib
+import mmap
 import os
-import shutil
+import posixpath
 import tarfile
 import tempfile
+import time
 import typing
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from flyteidl.service import dataproxy_pb2 as _data_proxy_pb2
@@ -13,8 +18,33 @@ from flyteidl.service import dataproxy_pb2 as _data_proxy_pb2
 from flytekit.core import context_manager
 from flytekit.core.tracker import get_full_module_path
 
+try:
+    # python-isal's igzip (``pip install flytekit[isal]``) is a drop-in, much faster gzip implementation backed by
+    # ISA-L. The archives it produces are regular gzip files, so they are unpacked the same way on the container side.
+    # Its compressed bytes differ from zlib's at the same level though, so the archive md5, and with it the upload
+    # location and the version derived from it, depends on whether isal is installed where the script is registered.
+    from isal import igzip as _gzip
+except ImportError:
+    _gzip = gzip
 
-def compress_single_script(source_path: str, destination: str, full_module_name: str):
+# Read files in large chunks when hashing, so that the digest is computed over big blocks instead of paying the
+# python-level call overhead for every few bytes.
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Both zlib and ISA-L support level 1, which trades a slightly bigger archive for much faster compression.
+_COMPRESSION_LEVEL = 1
+
+# Size of the blocks tarfile hands over to the gzip writer, bigger than the 10 KiB default to cut down on calls.
+_TAR_BUFFER_SIZE = 128 * 1024
+
+# Files modified less than this long ago are hashed without the cache: filesystems with coarse timestamps (HFS+,
+# FAT, ...) can keep the same mtime and size across a rewrite within that window, like git's "racy clean" entries.
+_RACY_MTIME_WINDOW_NS = 2 * 10**9
+
+
+def compress_single_script(
+    source_path: str, destination: typing.Union[str, os.PathLike, typing.BinaryIO], full_module_name: str
+):
     """
     Compresses the single script while maintaining the folder structure for that file.
 
@@ -40,38 +70,63 @@ def compress_single_script(source_path: str, destination: str, full_module_name:
     │       └── __init__.py
 
     Note how `another_example.py` and `yet_another_example.py` were not copied to the destination.
+
+    The destination can be either a path or a writable binary file object, e.g. an ``io.BytesIO`` to build the
+    archive in memory.
     """
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        destination_path = os.path.join(tmp_dir, "code")
-        # This is the script relative path to the root of the project
-        script_relative_path = Path()
-        # For each package in pkgs, create a directory and copy the __init__.py in it.
-        # Skip the last package as that is the script file.
-        pkgs = full_module_name.split(".")
-        for p in pkgs[:-1]:
-            os.makedirs(os.path.join(destination_path, p))
-            source_path = os.path.join(source_path, p)
-            destination_path = os.path.join(destination_path, p)
-            script_relative_path = Path(script_relative_path, p)
-            init_file = Path(os.path.join(source_path, "__init__.py"))
-            if init_file.exists():
-                shutil.copy(init_file, Path(os.path.join(tmp_dir, "code", script_relative_path, "__init__.py")))
-
-        # Ensure destination path exists to cover the case of a single file and no modules.
-        os.makedirs(destination_path, exist_ok=True)
-        script_file = Path(source_path, f"{pkgs[-1]}.py")
-        script_file_destination = Path(destination_path, f"{pkgs[-1]}.py")
-        # Build the final script relative path and copy it to a known place.
-        shutil.copy(
-            script_file,
-            script_file_destination,
+    with contextlib.ExitStack() as stack:
+        if isinstance(destination, (str, os.PathLike)):
+            destination = stack.enter_context(open(destination, "wb"))
+        # Stream the tar straight into the gzip writer instead of materializing an intermediate tar file. The
+        # archive only holds a handful of source files, so the fastest compression level is good enough. The file
+        # name is left out of the gzip header, so the archive bytes only depend on the files being compressed.
+        gzipped = stack.enter_context(
+            _gzip.GzipFile(filename="", fileobj=destination, mode="wb", mtime=0, compresslevel=_COMPRESSION_LEVEL)
+        )
+        # Files are added straight from the source tree, following symlinks the same way copying them would. The
+        # format is pinned so that pax/GNU extension headers don't vary with the interpreter's default tar format.
+        # pax still stores long member names, and only adds extended headers for those since the filter clears every
+        # other pax header. Identical bytes are only guaranteed for the same python version: older tarfile versions
+        # fill some header fields (e.g. devmajor/devminor) differently.
+        tar = stack.enter_context(
+            tarfile.open(
+                fileobj=gzipped,
+                mode="w|",
+                bufsize=_TAR_BUFFER_SIZE,
+                dereference=True,
+                format=tarfile.PAX_FORMAT,
+            )
         )
-        tar_path = os.path.join(tmp_dir, "tmp.tar")
-        with tarfile.open(tar_path, "w") as tar:
-            tar.add(os.path.join(tmp_dir, "code"), arcname="", filter=tar_strip_file_attributes)
-        with gzip.GzipFile(filename=destination, mode="wb", mtime=0) as gzipped:
-            with open(tar_path, "rb") as tar_file:
-                gzipped.write(tar_file.read())
+
+        # For each package the script lives in, add its directory and the __init__.py in it.
+        *pkgs, script_name = full_module_name.split(".")
+        # Archive names are the package paths relative to the root of the project, always posix separated.
+        package_paths = [posixpath.join(*pkgs[: i + 1]) for i in range(len(pkgs))]
+        for package_path in package_paths:
+            package_dir = os.path.join(source_path, package_path)
+            tar.add(package_dir, arcname=package_path, recursive=False, filter=_script_mode_tar_filter)
+            init_file = os.path.join(package_dir, "__init__.py")
+            # Stat the __init__.py only once: the same TarInfo tells whether it is there and is used to archive it.
+            try:
+                init_info = tar.gettarinfo(init_file, arcname=posixpath.join(package_path, "__init__.py"))
+            except FileNotFoundError:
+                continue
+            if init_info.isfile():
+                with open(init_file, "rb") as f:
+                    tar.addfile(_script_mode_tar_filter(init_info), f)
+
+        # This is the script relative path to the root of the project
+        script_relative_path = posixpath.join(*pkgs, f"{script_name}.py")
+        script_file = os.path.join(source_path, script_relative_path)
+        tar.add(script_file, arcname=script_relative_path, filter=_script_mode_tar_filter)
+
+
+def _script_mode_tar_filter(tar_info: tarfile.TarInfo) -> tarfile.TarInfo:
+    # Script mode archives only hold packages and python sources, so permissions can be normalized as well to keep
+    # the archive independent of the umask or checkout it was built from.
+    tar_info = tar_strip_file_attributes(tar_info)
+    tar_info.mode = 0o755 if tar_info.isdir() else 0o644
+    return tar_info
 
 
 # Takes in a TarInfo and returns the modified TarInfo:
@@ -117,16 +172,54 @@ def fast_register_single_script(
 def hash_file(file_path: typing.Union[os.PathLike, str]) -> (bytes, str):
     """
     Hash a file and produce a digest to be used as a version
+
+    The digest has to be md5: it is also sent to the data proxy as ``content_md5`` when requesting the signed upload
+    url, and as the ``Content-MD5`` header of the upload itself.
     """
-    h = hashlib.md5()
+    # Results are cached on the file's identity and stat, so hashing an unchanged file again is just a stat call.
+    # That only applies to files last modified a couple of seconds ago or more: freshly written files, like the
+    # script mode archive that is hashed again right before it is uploaded, are always read again.
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    if time.time_ns() - stat.st_mtime_ns < _RACY_MTIME_WINDOW_NS:
+        # The stat cannot tell this file apart from a rewrite that is yet to happen, so don't remember the result.
+        return _hash_file.__wrapped__(path, stat.st_mtime_ns, stat.st_size)
+    return _hash_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+def hash_files(file_paths: typing.List[typing.Union[os.PathLike, str]]) -> typing.Dict[str, typing.Tuple[bytes, str]]:
+    """
+    Hash several files concurrently, see :py:func:`hash_file`. hashlib releases the GIL while digesting large
+    buffers, so the files are hashed in parallel across threads.
 
-    with open(file_path, "rb") as file:
-        while True:
-            # Reading is buffered, so we can read smaller chunks.
-            chunk = file.read(h.block_size)
-            if not chunk:
-                break
-            h.update(chunk)
+    :return: A mapping from each given path to its (digest, hexdigest) pair.
+    """
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return dict(zip(file_paths, executor.map(hash_file, file_paths)))
+
+
+@lru_cache(maxsize=1024)
+def _hash_file(path: str, mtime_ns: int, size: int) -> (bytes, str):
+    # The file is consumed in large blocks (or mapped) anyway, so skip the extra copy through a buffered reader.
+    with open(path, "rb", buffering=0) as file:
+        # hashlib.file_digest (python 3.11+) runs the read/update loop in C and releases the GIL while hashing.
+        if hasattr(hashlib, "file_digest"):
+            h = hashlib.file_digest(file, "md5")
+        else:
+            h = hashlib.md5()
+            try:
+                # Map the file and digest it with a single update, without copying it into python objects first.
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    h.update(mm)
+            except (OSError, ValueError):
+                # Empty files and some special files cannot be mapped, read those in chunks instead, reusing one
+                # buffer for all of them.
+                view = memoryview(bytearray(_HASH_CHUNK_SIZE))
+                while True:
+                    read = file.readinto(view)
+                    if not read:
+                        break
+                    h.update(view[:read])
 
     return h.digest(), h.hexdigest()
 
@@ -141,6 +234,6 @@ def _find_project_root(source_path) -> Path:
     """
     # Start from the directory right above source_path
     path = Path(source_path).parent.resolve()
-    while os.path.exists(os.path.join(path, "__init__.py")):
+    while os.path.isfile(os.path.join(path, "__init__.py")):
         path = path.parent
     return path
@@ -11,7 +11,10 @@ if CURRENT_PYTHON < MIN_PYTHON_VERSION:
     )
     sys.exit(-1)
 
-extras_require = {}
+extras_require = {
+    # Faster gzip compression for script mode archives, see flytekit/tools/script_mode.py
+    "isal": ["isal"],
+}
 
 __version__ = "0.0.0+develop"
 
@@ -0,0 +1,12 @@
+import pytest
+
+from flytekit.core import context_manager
+
+
+@pytest.fixture(scope="session")
+def flyte_ctx():
+    """
+    The root FlyteContext. Tests that need a derived context (new file access, compilation or execution state) build it
+    from this one, instead of resolving the current context again every time.
+    """
+    return context_manager.FlyteContextManager.current_context()
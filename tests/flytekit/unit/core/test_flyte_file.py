@@ -5,6 +5,7 @@ import typing
 from unittest.mock import MagicMock
 
 import pytest
+import responses
 
 import flytekit.configuration
 from flytekit.configuration import Image, ImageConfig
@@ -33,10 +34,20 @@ def local_dummy_file():
         os.remove(path)
 
 
-def test_file_type_in_workflow_with_bad_format():
+# Fixture that provides an empty sandbox directory, and a FileAccessProvider using it as its local sandbox with the
+# mock_remote folder in it as the raw output prefix
+@pytest.fixture
+def sandbox_fs(tmp_path_factory):
+    random_dir = str(tmp_path_factory.mktemp("flyte_sb"))
+    fs = FileAccessProvider(local_sandbox_dir=random_dir, raw_output_prefix=os.path.join(random_dir, "mock_remote"))
+    return random_dir, fs
+
+
+@pytest.mark.io
+def test_file_type_in_workflow_with_bad_format(tmp_path):
     @task
     def t1() -> FlyteFile[typing.TypeVar("txt")]:
-        fname = "/tmp/flytekit_test"
+        fname = str(tmp_path / "flytekit_test")
         with open(fname, "w") as fh:
             fh.write("Hello World\n")
         return fname
@@ -71,7 +82,8 @@ def test_file_handling_remote_default_wf_input():
     assert sample_lp.parameters.parameters["fname"].default.scalar.blob.uri == SAMPLE_DATA
 
 
-def test_file_handling_local_file_gets_copied():
+@pytest.mark.io
+def test_file_handling_local_file_gets_copied(flyte_ctx, sandbox_fs):
     @task
     def t1() -> FlyteFile:
         # Use this test file itself, since we know it exists.
@@ -81,11 +93,8 @@ def test_file_handling_local_file_gets_copied():
     def my_wf() -> FlyteFile:
         return t1()
 
-    random_dir = context_manager.FlyteContext.current_context().file_access.get_random_local_directory()
-    # print(f"Random: {random_dir}")
-    fs = FileAccessProvider(local_sandbox_dir=random_dir, raw_output_prefix=os.path.join(random_dir, "mock_remote"))
-    ctx = context_manager.FlyteContext.current_context()
-    with context_manager.FlyteContextManager.with_context(ctx.with_file_access(fs)):
+    random_dir, fs = sandbox_fs
+    with context_manager.FlyteContextManager.with_context(flyte_ctx.with_file_access(fs)):
         top_level_files = os.listdir(random_dir)
         assert len(top_level_files) == 1  # the flytekit_local folder
 
@@ -98,7 +107,8 @@ def test_file_handling_local_file_gets_copied():
         assert x.path.startswith(random_dir)
 
 
-def test_file_handling_local_file_gets_force_no_copy():
+@pytest.mark.io
+def test_file_handling_local_file_gets_force_no_copy(flyte_ctx, sandbox_fs):
     @task
     def t1() -> FlyteFile:
         # Use this test file itself, since we know it exists.
@@ -108,10 +118,8 @@ def test_file_handling_local_file_gets_force_no_copy():
     def my_wf() -> FlyteFile:
         return t1()
 
-    random_dir = context_manager.FlyteContext.current_context().file_access.get_random_local_directory()
-    fs = FileAccessProvider(local_sandbox_dir=random_dir, raw_output_prefix=os.path.join(random_dir, "mock_remote"))
-    ctx = context_manager.FlyteContext.current_context()
-    with context_manager.FlyteContextManager.with_context(ctx.with_file_access(fs)):
+    random_dir, fs = sandbox_fs
+    with context_manager.FlyteContextManager.with_context(flyte_ctx.with_file_access(fs)):
         top_level_files = os.listdir(random_dir)
         assert len(top_level_files) == 1  # the flytekit_local folder
 
@@ -125,8 +133,12 @@ def test_file_handling_local_file_gets_force_no_copy():
         assert workflow_output.path == __file__
 
 
-def test_file_handling_remote_file_handling():
+@pytest.mark.io
+@responses.activate
+def test_file_handling_remote_file_handling(flyte_ctx, sandbox_fs):
     SAMPLE_DATA = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/pima-indians-diabetes.data.csv"
+    # Serve the download locally, the test is about flytekit's lazy download handling, not about github.
+    responses.add(responses.GET, SAMPLE_DATA, body=b"6,148,72,35,0,33.6,0.627,50,1\n")
 
     @task
     def t1() -> FlyteFile:
@@ -136,13 +148,8 @@ def test_file_handling_remote_file_handling():
     def my_wf() -> FlyteFile:
         return t1()
 
-    # This creates a random directory that we know is empty.
-    random_dir = context_manager.FlyteContext.current_context().file_access.get_random_local_directory()
-    # Creating a new FileAccessProvider will add two folderst to the random dir
-    print(f"Random {random_dir}")
-    fs = FileAccessProvider(local_sandbox_dir=random_dir, raw_output_prefix=os.path.join(random_dir, "mock_remote"))
-    ctx = context_manager.FlyteContext.current_context()
-    with context_manager.FlyteContextManager.with_context(ctx.with_file_access(fs)):
+    random_dir, fs = sandbox_fs
+    with context_manager.FlyteContextManager.with_context(flyte_ctx.with_file_access(fs)):
         working_dir = os.listdir(random_dir)
         assert len(working_dir) == 1  # the local_flytekit folder
 
@@ -176,8 +183,12 @@ def test_file_handling_remote_file_handling():
         # assert str(workflow_output).endswith(os.path.split(SAMPLE_DATA)[1])
 
 
-def test_file_handling_remote_file_handling_flyte_file():
+@pytest.mark.io
+@responses.activate
+def test_file_handling_remote_file_handling_flyte_file(flyte_ctx, sandbox_fs):
     SAMPLE_DATA = "https://raw.githubusercontent.com/jbrownlee/Datasets/master/pima-indians-diabetes.data.csv"
+    # Serve the download locally, the test is about flytekit's lazy download handling, not about github.
+    responses.add(responses.GET, SAMPLE_DATA, body=b"6,148,72,35,0,33.6,0.627,50,1\n")
 
     @task
     def t1() -> FlyteFile:
@@ -188,12 +199,8 @@ def test_file_handling_remote_file_handling_flyte_file():
     def my_wf() -> FlyteFile:
         return t1()
 
-    # This creates a random directory that we know is empty.
-    random_dir = context_manager.FlyteContext.current_context().file_access.get_random_local_directory()
-    # Creating a new FileAccessProvider will add two folderst to the random dir
-    fs = FileAccessProvider(local_sandbox_dir=random_dir, raw_output_prefix=os.path.join(random_dir, "mock_remote"))
-    ctx = context_manager.FlyteContext.current_context()
-    with context_manager.FlyteContextManager.with_context(ctx.with_file_access(fs)):
+    random_dir, fs = sandbox_fs
+    with context_manager.FlyteContextManager.with_context(flyte_ctx.with_file_access(fs)):
         working_dir = os.listdir(random_dir)
         assert len(working_dir) == 1  # the local_flytekit dir
 
@@ -232,7 +239,8 @@ def test_file_handling_remote_file_handling_flyte_file():
         assert str(workflow_output).endswith(os.path.split(SAMPLE_DATA)[1])
 
 
-def test_dont_convert_remotes():
+@pytest.mark.io
+def test_dont_convert_remotes(flyte_ctx):
     @task
     def t1(in1: FlyteFile):
         print(in1)
@@ -244,7 +252,7 @@ def test_dont_convert_remotes():
     fd = FlyteFile("s3://anything")
 
     with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_serialization_settings(
+        flyte_ctx.with_serialization_settings(
             flytekit.configuration.SerializationSettings(
                 project="test_proj",
                 domain="test_domain",
@@ -283,6 +291,7 @@ def test_download_caching():
     assert mock_downloader.call_count == 1
 
 
+@pytest.mark.io
 def test_returning_a_pathlib_path(local_dummy_file):
     @task
     def t1() -> FlyteFile:
@@ -320,6 +329,7 @@ def test_returning_a_pathlib_path(local_dummy_file):
         assert fh.read() == "Hello world"
 
 
+@pytest.mark.io
 def test_output_type_pathlike(local_dummy_file):
     @task
     def t1() -> os.PathLike:
@@ -336,6 +346,7 @@ def test_output_type_pathlike(local_dummy_file):
         assert fh.read() == "Hello world"
 
 
+@pytest.mark.io
 def test_input_type_pathlike(local_dummy_file):
     @task
     def t1(a: os.PathLike):
@@ -410,6 +421,7 @@ def test_file_guess():
     assert fft.extension() == ""
 
 
+@pytest.mark.io
 def test_flyte_file_in_dyn():
     @task
     def t1(path: str) -> FlyteFile:
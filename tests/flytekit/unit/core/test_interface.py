@@ -7,6 +7,7 @@ from typing_extensions import Annotated  # type: ignore
 from flytekit.core import context_manager
 from flytekit.core.docstring import Docstring
 from flytekit.core.interface import (
+    _type_hints_cache,
     extract_return_annotation,
     transform_function_to_interface,
     transform_inputs_to_parameters,
@@ -320,3 +321,42 @@ def test_parameter_change_to_pickle_type():
     assert params.parameters["a"].default is None
     assert our_interface.outputs["o0"].__origin__ == FlytePickle
     assert our_interface.inputs["a"].__origin__ == FlytePickle
+
+
+def test_type_hints_cached_per_definition():
+    def make(annotation):
+        def z(a: annotation, b: str = "b") -> annotation:
+            ...
+
+        return z
+
+    _type_hints_cache.clear()
+    for _ in range(3):
+        our_interface = transform_function_to_interface(make(int))
+        assert our_interface.inputs["a"] == int
+        assert our_interface.inputs_with_defaults["b"] == (str, "b")
+        assert our_interface.outputs["o0"] == int
+    assert len(_type_hints_cache) == 1
+
+    # The same code with different annotations must not reuse the hints resolved above
+    our_interface = transform_function_to_interface(make(float))
+    assert our_interface.inputs["a"] == float
+    assert our_interface.outputs["o0"] == float
+    assert len(_type_hints_cache) == 2
+
+    # Unhashable annotations are resolved without the cache
+    def y(a: Annotated[int, {"foo": "bar"}]) -> int:
+        ...
+
+    our_interface = transform_function_to_interface(y)
+    assert our_interface.inputs["a"] == Annotated[int, {"foo": "bar"}]
+    assert len(_type_hints_cache) == 2
+
+    # Forward references depend on the module namespace at the time they are resolved, so they are not cached
+    def x(a: "int", b: typing.List["str"]) -> int:
+        ...
+
+    our_interface = transform_function_to_interface(x)
+    assert our_interface.inputs["a"] == int
+    assert our_interface.inputs["b"] == typing.List[str]
+    assert len(_type_hints_cache) == 2
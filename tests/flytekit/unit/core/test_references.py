@@ -18,6 +18,16 @@ from flytekit.core.workflow import reference_workflow, workflow
 from flytekit.models.core import identifier as _identifier_model
 from flytekit.tools.translator import get_serializable
 
+serialization_settings = flytekit.configuration.SerializationSettings(
+    project="test_proj",
+    domain="test_domain",
+    version="abc",
+    image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
+    env={},
+)
+
+OutputsBC = typing.NamedTuple("OutputsBC", [("t1_int_output", int), ("c", str)])
+
 
 # This is used for docs
 def test_ref_docs():
@@ -59,13 +69,6 @@ def test_ref():
     assert ref_t1.id.name == "recipes.aaa.simple.join_strings"
     assert ref_t1.id.version == "553018f39e519bdb2597b652639c30ce16b99c79"
 
-    serialization_settings = flytekit.configuration.SerializationSettings(
-        project="test_proj",
-        domain="test_domain",
-        version="abc",
-        image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-        env={},
-    )
     spec = get_serializable(OrderedDict(), serialization_settings, ref_t1)
     assert isinstance(spec, ReferenceSpec)
     assert isinstance(spec.template, ReferenceTemplate)
@@ -74,28 +77,42 @@ def test_ref():
 
 
 def test_ref_task_more():
-    @reference_task(
-        project="flytesnacks",
-        domain="development",
-        name="recipes.aaa.simple.join_strings",
-        version="553018f39e519bdb2597b652639c30ce16b99c79",
-    )
-    def ref_t1(a: typing.List[str]) -> str:
-        ...
-
     @workflow
     def wf1(in1: typing.List[str]) -> str:
         return ref_t1(a=in1)
 
-    with pytest.raises(Exception) as e:
+    with pytest.raises(Exception, match="You must mock this out"):
         wf1(in1=["hello", "world"])
-    assert "You must mock this out" in f"{e}"
 
     with task_mock(ref_t1) as mock:
         mock.return_value = "hello"
         assert wf1(in1=["hello", "world"]) == "hello"
 
 
+def test_ref_task_nested_mocks():
+    @workflow
+    def wf1(in1: typing.List[str]) -> str:
+        return ref_t1(a=in1)
+
+    with task_mock(ref_t1) as outer:
+        outer.return_value = "outer"
+        with task_mock(ref_t1) as inner:
+            inner.return_value = "inner"
+            assert wf1(in1=["hello"]) == "inner"
+        assert wf1(in1=["hello"]) == "outer"
+
+    # Leaving mocks out of order removes the mock that was left, not the innermost one
+    outer_cm, inner_cm = task_mock(ref_t1), task_mock(ref_t1)
+    outer_cm.__enter__().return_value = "outer"
+    inner_cm.__enter__().return_value = "inner"
+    outer_cm.__exit__(None, None, None)
+    assert wf1(in1=["hello"]) == "inner"
+    inner_cm.__exit__(None, None, None)
+
+    with pytest.raises(Exception, match="You must mock this out"):
+        wf1(in1=["hello"])
+
+
 @reference_workflow(project="proj", domain="development", name="wf_name", version="abc")
 def ref_wf1(a: int) -> typing.Tuple[str, str]:
     ...
@@ -103,7 +120,7 @@ def ref_wf1(a: int) -> typing.Tuple[str, str]:
 
 def test_reference_workflow():
     @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
+    def t1(a: int) -> OutputsBC:
         a = a + 2
         return a, "world-" + str(a)
 
@@ -113,7 +130,7 @@ def test_reference_workflow():
         u, v = ref_wf1(a=x)
         return x, u, v
 
-    with pytest.raises(Exception):
+    with pytest.raises(Exception, match="You must mock this out"):
         my_wf(a=3, b="foo")
 
     @patch(ref_wf1)
@@ -127,7 +144,7 @@ def test_reference_workflow():
     inner_test()
 
     # Ensure that the patching is only for the duration of that test
-    with pytest.raises(Exception):
+    with pytest.raises(Exception, match="You must mock this out"):
         my_wf(a=3, b="foo")
 
 
@@ -248,13 +265,6 @@ def test_lps(resource_type):
     def wf1(a: str, b: int):
         ref_entity(a=a, b=b)
 
-    serialization_settings = flytekit.configuration.SerializationSettings(
-        project="test_proj",
-        domain="test_domain",
-        version="abc",
-        image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-        env={},
-    )
     wf_spec = get_serializable(OrderedDict(), serialization_settings, wf1)
     assert len(wf_spec.template.interface.inputs) == 2
     assert len(wf_spec.template.interface.outputs) == 0
@@ -295,13 +305,6 @@ def test_ref_sub_wf():
     def wf1(a: str, b: int):
         ref_entity(a=a, b=b)
 
-    serialization_settings = flytekit.configuration.SerializationSettings(
-        project="test_proj",
-        domain="test_domain",
-        version="abc",
-        image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-        env={},
-    )
     with pytest.raises(Exception, match="currently unsupported"):
         # Subworkflow as references don't work (probably ever). The reason is because we'd need to make a network call
         # to admin to get the structure of the subworkflow and the whole point of reference entities is that there
@@ -343,13 +346,6 @@ def test_lp_with_output():
 
     inner_test()
 
-    serialization_settings = flytekit.configuration.SerializationSettings(
-        project="test_proj",
-        domain="test_domain",
-        version="abc",
-        image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-        env={},
-    )
     wf_spec = get_serializable(OrderedDict(), serialization_settings, wf1)
     assert wf_spec.template.nodes[1].workflow_node.launchplan_ref.project == "proj"
     assert wf_spec.template.nodes[1].workflow_node.launchplan_ref.name == "app.other.flyte_entity"
@@ -412,15 +408,7 @@ def test_ref_dynamic_task():
         return s
 
     with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_serialization_settings(
-            flytekit.configuration.SerializationSettings(
-                project="test_proj",
-                domain="test_domain",
-                version="abc",
-                image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-                env={},
-            )
-        )
+        context_manager.FlyteContextManager.current_context().with_serialization_settings(serialization_settings)
     ) as ctx:
         new_exc_state = ctx.execution_state.with_params(mode=context_manager.ExecutionState.Mode.TASK_EXECUTION)
         with context_manager.FlyteContextManager.with_context(ctx.with_execution_state(new_exc_state)) as ctx:
@@ -441,15 +429,7 @@ def test_ref_dynamic_lp():
         return s
 
     with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_serialization_settings(
-            flytekit.configuration.SerializationSettings(
-                project="test_proj",
-                domain="test_domain",
-                version="abc",
-                image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-                env={},
-            )
-        )
+        context_manager.FlyteContextManager.current_context().with_serialization_settings(serialization_settings)
     ) as ctx:
         new_exc_state = ctx.execution_state.with_params(mode=context_manager.ExecutionState.Mode.TASK_EXECUTION)
         with context_manager.FlyteContextManager.with_context(ctx.with_execution_state(new_exc_state)) as ctx:
@@ -11,11 +11,10 @@ from enum import Enum
 from textwrap import dedent
 
 import pandas
-import pandas as pd
 import pytest
 from dataclasses_json import dataclass_json
 from google.protobuf.struct_pb2 import Struct
-from pandas._testing import assert_frame_equal
+from pandas.testing import assert_frame_equal
 from typing_extensions import Annotated, get_origin
 
 import flytekit
@@ -53,6 +52,48 @@ serialization_settings = flytekit.configuration.SerializationSettings(
     env={},
 )
 
+image_serialization_settings = flytekit.configuration.SerializationSettings(
+    project="test_proj",
+    domain="test_domain",
+    version="abc",
+    image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
+    env={},
+)
+
+OutputsBC = typing.NamedTuple("OutputsBC", [("t1_int_output", int), ("c", str)])
+
+
+@pytest.fixture(scope="module")
+def t1_int_str():
+    @task
+    def t1(a: int) -> OutputsBC:
+        return a + 2, "world"
+
+    return t1
+
+
+@pytest.fixture(scope="module")
+def t2_concat():
+    @task
+    def t2(a: str, b: str) -> str:
+        return b + a
+
+    return t2
+
+
+@pytest.fixture(scope="module")
+def t2_identity():
+    @task
+    def t2(a: str) -> str:
+        return a
+
+    return t2
+
+
+@pytest.fixture(scope="module")
+def simple_wf(t1_int_str, t2_concat):
+    return _wf_tuple_outputs(t1_int_str, t2_concat)
+
 
 def test_default_wf_params_works():
     @task
@@ -98,14 +139,14 @@ def test_annotated_namedtuple_output():
     assert get_origin(my_task.python_interface.outputs["a"]) is Annotated
 
 
-def test_simple_input_no_output():
+def test_simple_input_no_output(flyte_ctx):
     @task
     def my_task(a: int):
         pass
 
     assert my_task(a=3) is None
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
     with context_manager.FlyteContextManager.with_context(ctx.with_new_compilation_state()) as ctx:
         outputs = my_task(a=3)
         assert isinstance(outputs, VoidPromise)
@@ -113,14 +154,14 @@ def test_simple_input_no_output():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_single_output():
+def test_single_output(flyte_ctx):
     @task
     def my_task() -> str:
         return "Hello world"
 
     assert my_task() == "Hello world"
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
     with context_manager.FlyteContextManager.with_context(ctx.with_new_compilation_state()) as ctx:
         outputs = my_task()
         assert ctx.compilation_state is not None
@@ -132,18 +173,21 @@ def test_single_output():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_engine_file_output():
+@pytest.mark.io
+def test_engine_file_output(tmp_path, flyte_ctx):
     basic_blob_type = _core_types.BlobType(
         format="",
         dimensionality=_core_types.BlobType.BlobDimensionality.SINGLE,
     )
 
-    fs = FileAccessProvider(local_sandbox_dir="/tmp/flytetesting", raw_output_prefix="/tmp/flyteraw")
-    ctx = context_manager.FlyteContextManager.current_context()
+    fs = FileAccessProvider(
+        local_sandbox_dir=str(tmp_path / "flytetesting"), raw_output_prefix=str(tmp_path / "flyteraw")
+    )
+    ctx = flyte_ctx
 
     with context_manager.FlyteContextManager.with_context(ctx.with_file_access(fs)) as ctx:
         # Write some text to a file not in that directory above
-        test_file_location = "/tmp/sample.txt"
+        test_file_location = str(tmp_path / "sample.txt")
         with open(test_file_location, "w") as fh:
             fh.write("Hello World\n")
 
@@ -161,28 +205,14 @@ def test_engine_file_output():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_wf1():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
-    @task
-    def t2(a: str, b: str) -> str:
-        return b + a
+def test_wf1(simple_wf):
+    assert len(simple_wf._nodes) == 2
+    assert simple_wf._nodes[0].id == "n0"
+    assert simple_wf._nodes[1]._upstream_nodes[0] is simple_wf._nodes[0]
 
-    @workflow
-    def my_wf(a: int, b: str) -> (int, str):
-        x, y = t1(a=a)
-        d = t2(a=y, b=b)
-        return x, d
-
-    assert len(my_wf._nodes) == 2
-    assert my_wf._nodes[0].id == "n0"
-    assert my_wf._nodes[1]._upstream_nodes[0] is my_wf._nodes[0]
-
-    assert len(my_wf._output_bindings) == 2
-    assert my_wf._output_bindings[0].var == "o0"
-    assert my_wf._output_bindings[0].binding.promise.var == "t1_int_output"
+    assert len(simple_wf._output_bindings) == 2
+    assert simple_wf._output_bindings[0].var == "o0"
+    assert simple_wf._output_bindings[0].binding.promise.var == "t1_int_output"
 
     nt = typing.NamedTuple("SingleNT", t1_int_output=float)
 
@@ -197,67 +227,91 @@ def test_wf1():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_wf1_run():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
-    @task
-    def t2(a: str, b: str) -> str:
-        return b + a
-
+def _wf_tuple_outputs(t1, t2):
     @workflow
     def my_wf(a: int, b: str) -> (int, str):
         x, y = t1(a=a)
         d = t2(a=y, b=b)
         return x, d
 
-    x = my_wf(a=5, b="hello ")
-    assert x == (7, "hello world")
+    return my_wf
 
+
+def _wf_named_outputs(t1, t2):
     @workflow
-    def my_wf2(a: int, b: str) -> (int, str):
+    def my_wf(a: int, b: str) -> (int, str):
         tup = t1(a=a)
         d = t2(a=tup.c, b=b)
         return tup.t1_int_output, d
 
-    x = my_wf2(a=5, b="hello ")
-    assert x == (7, "hello world")
-    assert context_manager.FlyteContextManager.size() == 1
-
-
-def test_wf1_with_overrides():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
+    return my_wf
 
-    @task
-    def t2(a: str, b: str) -> str:
-        return b + a
 
+def _wf_with_overrides(t1, t2):
     @workflow
     def my_wf(a: int, b: str) -> (int, str):
         x, y = t1(a=a).with_overrides(name="x")
         d = t2(a=y, b=b).with_overrides()
         return x, d
 
-    x = my_wf(a=5, b="hello ")
-    assert x == (7, "hello world")
-    assert context_manager.FlyteContextManager.size() == 1
+    return my_wf
 
 
-def test_wf1_with_list_of_inputs():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
+def _wf_compile_time_constant_vars(t1, t2):
+    @workflow
+    def my_wf(a: int, b: str) -> (int, str):
+        x, y = t1(a=a)
+        d = t2(a="This is my way", b=b)
+        return x, d
+
+    return my_wf
+
 
+def _wf_constant_return(t1, t2):
+    @workflow
+    def my_wf(a: int, b: str) -> (int, str):
+        x, y = t1(a=a)
+        t2(a="This is my way", b=b)
+        return x, "A constant output"
+
+    return my_wf
+
+
+def _wf_only_constant_return(t1, t2):
+    @workflow
+    def my_wf(a: int, b: str) -> int:
+        t1(a=a)
+        t2(a="This is my way", b=b)
+        return 10
+
+    return my_wf
+
+
+@pytest.mark.parametrize(
+    "build_wf, expected",
+    [
+        (_wf_tuple_outputs, (7, "hello world")),
+        (_wf_named_outputs, (7, "hello world")),
+        (_wf_with_overrides, (7, "hello world")),
+        (_wf_compile_time_constant_vars, (7, "hello This is my way")),
+        (_wf_constant_return, (7, "A constant output")),
+        (_wf_only_constant_return, 10),
+    ],
+)
+def test_wf1_run(t1_int_str, t2_concat, build_wf, expected):
+    my_wf = build_wf(t1_int_str, t2_concat)
+    assert my_wf(a=5, b="hello ") == expected
+    assert context_manager.FlyteContextManager.size() == 1
+
+
+def test_wf1_with_list_of_inputs(t1_int_str):
     @task
     def t2(a: typing.List[str]) -> str:
         return " ".join(a)
 
     @workflow
     def my_wf(a: int, b: str) -> (int, str):
-        xx, yy = t1(a=a)
+        xx, yy = t1_int_str(a=a)
         d = t2(a=[b, yy])
         return xx, d
 
@@ -266,7 +320,7 @@ def test_wf1_with_list_of_inputs():
 
     @workflow
     def my_wf2(a: int, b: str) -> int:
-        x, y = t1(a=a)
+        x, y = t1_int_str(a=a)
         t2(a=[b, y])
         return x
 
@@ -297,14 +351,14 @@ def test_wf_output_mismatch():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_promise_return():
+def test_promise_return(flyte_ctx):
     """
     Testing that when a workflow is local executed but a local wf execution context already exists, Promise objects
     are returned wrapping Flyte literals instead of the unpacked dict.
     """
 
     @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
+    def t1(a: int) -> OutputsBC:
         a = a + 2
         return a, "world-" + str(a)
 
@@ -314,7 +368,7 @@ def test_promise_return():
         u, v = t1(a=x)
         return y, v
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
 
     with context_manager.FlyteContextManager.with_context(
         ctx.with_execution_state(
@@ -330,6 +384,7 @@ def test_promise_return():
     assert context_manager.FlyteContextManager.size() == 1
 
 
+@pytest.mark.io
 def test_wf1_with_sql():
     sql = SQLTask(
         "my-query",
@@ -354,6 +409,7 @@ def test_wf1_with_sql():
     assert context_manager.FlyteContextManager.size() == 1
 
 
+@pytest.mark.io
 def test_wf1_with_sql_with_patch():
     sql = SQLTask(
         "my-query",
@@ -382,6 +438,7 @@ def test_wf1_with_sql_with_patch():
     assert context_manager.FlyteContextManager.size() == 1
 
 
+@pytest.mark.io
 def test_flyte_file_in_dataclass():
     @dataclass_json
     @dataclass
@@ -432,6 +489,7 @@ def test_flyte_file_in_dataclass():
     assert "s3://somewhere" == wf(path="s3://somewhere")[1].remote_source
 
 
+@pytest.mark.io
 def test_flyte_directory_in_dataclass():
     @dataclass_json
     @dataclass
@@ -463,8 +521,9 @@ def test_flyte_directory_in_dataclass():
     assert flyte_tmp_dir in wf(path="s3://somewhere").path
 
 
-def test_structured_dataset_in_dataclass():
-    df = pd.DataFrame({"Name": ["Tom", "Joseph"], "Age": [20, 22]})
+@pytest.mark.io
+def test_structured_dataset_in_dataclass(tmp_path):
+    df = pandas.DataFrame({"Name": ["Tom", "Joseph"], "Age": [20, 22]})
 
     @dataclass_json
     @dataclass
@@ -486,11 +545,11 @@ def test_structured_dataset_in_dataclass():
     def wf(path: str) -> DatasetStruct:
         return t1(path=path)
 
-    res = wf(path="/tmp/somewhere")
+    res = wf(path=str(tmp_path / "somewhere"))
     assert "parquet" == res.a.file_format
     assert "parquet" == res.b.a.file_format
-    assert_frame_equal(df, res.a.open(pd.DataFrame).all())
-    assert_frame_equal(df, res.b.a.open(pd.DataFrame).all())
+    assert_frame_equal(df, res.a.open(pandas.DataFrame).all())
+    assert_frame_equal(df, res.b.a.open(pandas.DataFrame).all())
 
 
 def test_wf1_with_map():
@@ -513,55 +572,7 @@ def test_wf1_with_map():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_wf1_compile_time_constant_vars():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
-    @task
-    def t2(a: str, b: str) -> str:
-        return b + a
-
-    @workflow
-    def my_wf(a: int, b: str) -> (int, str):
-        x, y = t1(a=a)
-        d = t2(a="This is my way", b=b)
-        return x, d
-
-    x = my_wf(a=5, b="hello ")
-    assert x == (7, "hello This is my way")
-    assert context_manager.FlyteContextManager.size() == 1
-
-
-def test_wf1_with_constant_return():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
-    @task
-    def t2(a: str, b: str) -> str:
-        return b + a
-
-    @workflow
-    def my_wf(a: int, b: str) -> (int, str):
-        x, y = t1(a=a)
-        t2(a="This is my way", b=b)
-        return x, "A constant output"
-
-    x = my_wf(a=5, b="hello ")
-    assert x == (7, "A constant output")
-
-    @workflow
-    def my_wf2(a: int, b: str) -> int:
-        t1(a=a)
-        t2(a="This is my way", b=b)
-        return 10
-
-    assert my_wf2(a=5, b="hello ") == 10
-    assert context_manager.FlyteContextManager.size() == 1
-
-
-def test_wf1_with_dynamic():
+def test_wf1_with_dynamic(flyte_ctx):
     @task
     def t1(a: int) -> str:
         a = a + 2
@@ -589,15 +600,7 @@ def test_wf1_with_dynamic():
     assert x == ("hello hello ", ["world-" + str(i) for i in range(2, v + 2)])
 
     with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_serialization_settings(
-            flytekit.configuration.SerializationSettings(
-                project="test_proj",
-                domain="test_domain",
-                version="abc",
-                image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-                env={},
-            )
-        )
+        flyte_ctx.with_serialization_settings(image_serialization_settings)
     ) as ctx:
         new_exc_state = ctx.execution_state.with_params(mode=ExecutionState.Mode.TASK_EXECUTION)
         with context_manager.FlyteContextManager.with_context(ctx.with_execution_state(new_exc_state)) as ctx:
@@ -608,7 +611,7 @@ def test_wf1_with_dynamic():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_wf1_with_fast_dynamic():
+def test_wf1_with_fast_dynamic(flyte_ctx):
     @task
     def t1(a: int) -> str:
         a = a + 2
@@ -627,7 +630,7 @@ def test_wf1_with_fast_dynamic():
         return v
 
     with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_serialization_settings(
+        flyte_ctx.with_serialization_settings(
             flytekit.configuration.SerializationSettings(
                 project="test_proj",
                 domain="test_domain",
@@ -663,7 +666,8 @@ def test_wf1_with_fast_dynamic():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_list_output():
+@pytest.mark.parametrize("n", [1, pytest.param(10, marks=pytest.mark.slow)])
+def test_list_output(n):
     @task
     def t1(a: int) -> str:
         a = a + 2
@@ -673,14 +677,14 @@ def test_list_output():
     def lister() -> typing.List[str]:
         s = []
         # FYI: For users who happen to look at this, keep in mind this is only run once at compile time.
-        for i in range(10):
+        for i in range(n):
             s.append(t1(a=i))
         return s
 
     assert len(lister.interface.outputs) == 1
     binding_data = lister._output_bindings[0].binding  # the property should be named binding_data
     assert binding_data.collection is not None
-    assert len(binding_data.collection.bindings) == 10
+    assert len(binding_data.collection.bindings) == n
 
 
 def test_comparison_refs():
@@ -730,28 +734,26 @@ def test_comparison_lits():
     eval_expr(px != 5, False)
 
 
-def test_wf1_branches():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
-    @task
-    def t2(a: str) -> str:
-        return a
-
+def test_wf1_branches(t1_int_str, t2_identity):
     @workflow
     def my_wf(a: int, b: str) -> (int, str):
-        x, y = t1(a=a)
+        x, y = t1_int_str(a=a)
         d = (
             conditional("test1")
             .if_(x == 4)
-            .then(t2(a=b))
+            .then(t2_identity(a=b))
             .elif_(x >= 5)
-            .then(t2(a=y))
+            .then(t2_identity(a=y))
             .else_()
             .fail("Unable to choose branch")
         )
-        f = conditional("test2").if_(d == "hello ").then(t2(a="It is hello")).else_().then(t2(a="Not Hello!"))
+        f = (
+            conditional("test2")
+            .if_(d == "hello ")
+            .then(t2_identity(a="It is hello"))
+            .else_()
+            .then(t2_identity(a="Not Hello!"))
+        )
         return x, f
 
     x = my_wf(a=5, b="hello ")
@@ -786,7 +788,7 @@ def test_wf1_branches_ne():
 
 def test_wf1_branches_no_else_malformed_but_no_error():
     @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
+    def t1(a: int) -> OutputsBC:
         return a + 2, "world"
 
     @task
@@ -805,24 +807,16 @@ def test_wf1_branches_no_else_malformed_but_no_error():
     assert context_manager.FlyteContextManager.size() == 1
 
 
-def test_wf1_branches_failing():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
-    @task
-    def t2(a: str) -> str:
-        return a
-
+def test_wf1_branches_failing(t1_int_str, t2_identity):
     @workflow
     def my_wf(a: int, b: str) -> (int, str):
-        x, y = t1(a=a)
+        x, y = t1_int_str(a=a)
         d = (
             conditional("test1")
             .if_(x == 4)
-            .then(t2(a=b))
+            .then(t2_identity(a=b))
             .elif_(x >= 5)
-            .then(t2(a=y))
+            .then(t2_identity(a=y))
             .else_()
             .fail("All Branches failed")
         )
@@ -849,6 +843,7 @@ def test_cant_use_normal_tuples_as_output():
             return (a, 3)
 
 
+@pytest.mark.io
 def test_wf1_df():
     @task
     def t1(a: int) -> pandas.DataFrame:
@@ -865,15 +860,14 @@ def test_wf1_df():
 
     x = my_wf(a=20)
     assert isinstance(x, pandas.DataFrame)
-    result_df = x.reset_index(drop=True) == pandas.DataFrame(
-        data={"col1": [20, 2, 5, 10], "col2": [20, 4, 5, 10]}
-    ).reset_index(drop=True)
-    assert result_df.all().all()
+    assert_frame_equal(
+        x.reset_index(drop=True), pandas.DataFrame(data={"col1": [20, 2, 5, 10], "col2": [20, 4, 5, 10]})
+    )
 
 
 def test_lp_serialize():
     @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
+    def t1(a: int) -> OutputsBC:
         a = a + 2
         return a, "world-" + str(a)
 
@@ -890,13 +884,6 @@ def test_lp_serialize():
     lp = launch_plan.LaunchPlan.create("serialize_test1", my_subwf)
     lp_with_defaults = launch_plan.LaunchPlan.create("serialize_test2", my_subwf, default_inputs={"a": 3})
 
-    serialization_settings = flytekit.configuration.SerializationSettings(
-        project="proj",
-        domain="dom",
-        version="123",
-        image_config=ImageConfig(Image(name="name", fqn="asdf/fdsa", tag="123")),
-        env={},
-    )
     lp_model = get_serializable(OrderedDict(), serialization_settings, lp)
     assert len(lp_model.spec.default_inputs.parameters) == 1
     assert lp_model.spec.default_inputs.parameters["a"].required
@@ -987,6 +974,7 @@ def test_wf_tuple_fails():
             return a[0] + 2, str(a) + "-HELLO"
 
 
+@pytest.mark.io
 def test_wf_typed_schema():
     schema1 = FlyteSchema[kwtypes(x=int, y=str)]
 
@@ -1008,22 +996,18 @@ def test_wf_typed_schema():
     w = t1()
     assert w is not None
     df = w.open(override_mode=SchemaOpenMode.READ).all()
-    result_df = df.reset_index(drop=True) == pandas.DataFrame(data={"x": [1, 2], "y": ["3", "4"]}).reset_index(
-        drop=True
-    )
-    assert result_df.all().all()
+    assert_frame_equal(df.reset_index(drop=True), pandas.DataFrame(data={"x": [1, 2], "y": ["3", "4"]}))
 
     df = t2(s=w.as_readonly())
     df = df.open(override_mode=SchemaOpenMode.READ).all()
-    result_df = df.reset_index(drop=True) == pandas.DataFrame(data={"x": [1, 2]}).reset_index(drop=True)
-    assert result_df.all().all()
+    assert_frame_equal(df.reset_index(drop=True), pandas.DataFrame(data={"x": [1, 2]}))
 
     x = wf()
     df = x.open().all()
-    result_df = df.reset_index(drop=True) == pandas.DataFrame(data={"x": [1, 2]}).reset_index(drop=True)
-    assert result_df.all().all()
+    assert_frame_equal(df.reset_index(drop=True), pandas.DataFrame(data={"x": [1, 2]}))
 
 
+@pytest.mark.io
 def test_wf_schema_to_df():
     schema1 = FlyteSchema[kwtypes(x=int, y=str)]
 
@@ -1045,18 +1029,14 @@ def test_wf_schema_to_df():
     assert x == 2
 
 
-def test_dict_wf_with_constants():
-    @task
-    def t1(a: int) -> typing.NamedTuple("OutputsBC", t1_int_output=int, c=str):
-        return a + 2, "world"
-
+def test_dict_wf_with_constants(t1_int_str):
     @task
     def t2(a: typing.Dict[str, str]) -> str:
-        return " ".join([v for k, v in a.items()])
+        return " ".join(a.values())
 
     @workflow
     def my_wf(a: int, b: str) -> (int, str):
-        x, y = t1(a=a)
+        x, y = t1_int_str(a=a)
         d = t2(a={"key1": b, "key2": y})
         return x, d
 
@@ -1071,8 +1051,7 @@ def test_dict_wf_with_conversion():
 
     @task
     def t2(a: dict) -> str:
-        print(f"HAHAH {a}")
-        return " ".join([v for k, v in a.items()])
+        return " ".join(a.values())
 
     @workflow
     def my_wf(a: int) -> str:
@@ -1234,6 +1213,7 @@ def test_enum_in_dataclass():
     assert wf(x=10) == Datum(10, Color.RED)
 
 
+@pytest.mark.io
 def test_flyte_schema_dataclass():
     TestSchema = FlyteSchema[kwtypes(some_str=str)]
 
@@ -1263,7 +1243,7 @@ def test_flyte_schema_dataclass():
     assert wf(x=10) == Result(result=InnerResult(number=10, schema=schema), schema=schema)
 
 
-def test_environment():
+def test_environment(flyte_ctx):
     @task(environment={"FOO": "foofoo", "BAZ": "baz"})
     def t1(a: int) -> str:
         a = a + 2
@@ -1281,14 +1261,12 @@ def test_environment():
         image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
         env={"FOO": "foo", "BAR": "bar"},
     )
-    with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_new_compilation_state()
-    ):
+    with context_manager.FlyteContextManager.with_context(flyte_ctx.with_new_compilation_state()):
         task_spec = get_serializable(OrderedDict(), serialization_settings, t1)
         assert task_spec.template.container.env == {"FOO": "foofoo", "BAR": "bar", "BAZ": "baz"}
 
 
-def test_resources():
+def test_resources(flyte_ctx):
     @task(
         requests=Resources(cpu="1", ephemeral_storage="500Mi"),
         limits=Resources(cpu="2", mem="400M", ephemeral_storage="501Mi"),
@@ -1307,17 +1285,8 @@ def test_resources():
         x = t1(a=a)
         return x
 
-    serialization_settings = flytekit.configuration.SerializationSettings(
-        project="test_proj",
-        domain="test_domain",
-        version="abc",
-        image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-        env={},
-    )
-    with context_manager.FlyteContextManager.with_context(
-        context_manager.FlyteContextManager.current_context().with_new_compilation_state()
-    ):
-        task_spec = get_serializable(OrderedDict(), serialization_settings, t1)
+    with context_manager.FlyteContextManager.with_context(flyte_ctx.with_new_compilation_state()):
+        task_spec = get_serializable(OrderedDict(), image_serialization_settings, t1)
         assert task_spec.template.container.resources.requests == [
             _resource_models.ResourceEntry(_resource_models.ResourceName.EPHEMERAL_STORAGE, "500Mi"),
             _resource_models.ResourceEntry(_resource_models.ResourceName.CPU, "1"),
@@ -1395,7 +1364,7 @@ def test_secrets():
             pass
 
 
-def test_nested_dynamic():
+def test_nested_dynamic(flyte_ctx):
     @task
     def t1(a: int) -> str:
         a = a + 2
@@ -1422,17 +1391,9 @@ def test_nested_dynamic():
     x = my_wf(a=v, b="hello ")
     assert x == ("hello hello ", ["world-" + str(i) for i in range(2, v + 2)])
 
-    settings = flytekit.configuration.SerializationSettings(
-        project="test_proj",
-        domain="test_domain",
-        version="abc",
-        image_config=ImageConfig(Image(name="name", fqn="image", tag="name")),
-        env={},
-    )
-
     nested_my_subwf = my_wf.get_all_tasks()[0]
 
-    ctx = context_manager.FlyteContextManager.current_context().with_serialization_settings(settings)
+    ctx = flyte_ctx.with_serialization_settings(image_serialization_settings)
     with context_manager.FlyteContextManager.with_context(ctx) as ctx:
         es = ctx.new_execution_state().with_params(mode=ExecutionState.Mode.TASK_EXECUTION)
         with context_manager.FlyteContextManager.with_context(ctx.with_execution_state(es)) as ctx:
@@ -1511,7 +1472,7 @@ def test_conditional_asymmetric_return():
     assert consume_outputs(my_input=4) == 16
 
 
-def test_guess_dict():
+def test_guess_dict(flyte_ctx):
     @task
     def t2(a: dict) -> str:
         return ", ".join([f"K: {k} V: {v}" for k, v in a.items()])
@@ -1524,7 +1485,7 @@ def test_guess_dict():
 
     input_map = {"a": {"k1": "v1", "k2": "2"}}
     guessed_types = {"a": pt}
-    ctx = context_manager.FlyteContext.current_context()
+    ctx = flyte_ctx
     lm = TypeEngine.dict_to_literal_map(ctx, d=input_map, type_hints=guessed_types)
     assert isinstance(lm.literals["a"].scalar.generic, Struct)
 
@@ -1547,7 +1508,7 @@ def test_guess_dict2():
     assert pt_map == {"a": typing.List[dict]}
 
 
-def test_guess_dict3():
+def test_guess_dict3(flyte_ctx):
     @task
     def t2() -> dict:
         return {"k1": "v1", "k2": 3, 4: {"one": [1, "two", [3]]}}
@@ -1557,14 +1518,14 @@ def test_guess_dict3():
     pt_map = TypeEngine.guess_python_types(task_spec.template.interface.outputs)
     assert pt_map["o0"] is dict
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
     output_lm = t2.dispatch_execute(ctx, _literal_models.LiteralMap(literals={}))
     expected_struct = Struct()
     expected_struct.update({"k1": "v1", "k2": 3, "4": {"one": [1, "two", [3]]}})
     assert output_lm.literals["o0"].scalar.generic == expected_struct
 
 
-def test_guess_dict4():
+def test_guess_dict4(flyte_ctx):
     @dataclass_json
     @dataclass
     class Foo(object):
@@ -1587,7 +1548,7 @@ def test_guess_dict4():
     pt_map = TypeEngine.guess_python_types(task_spec.template.interface.outputs)
     assert dataclasses.is_dataclass(pt_map["o0"])
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
     output_lm = t1.dispatch_execute(ctx, _literal_models.LiteralMap(literals={}))
     expected_struct = Struct()
     expected_struct.update({"x": 1, "y": "foo", "z": {"hello": "world"}})
@@ -1632,6 +1593,7 @@ def test_error_messages():
         foo3(a=[{"hello": 2}])  # type: ignore
 
 
+@pytest.mark.io
 def test_union_type():
     ut = typing.Union[int, str, float, FlyteFile, FlyteSchema, typing.List[int], typing.Dict[str, int]]
 
@@ -1811,7 +1773,7 @@ def test_union_type_ambiguity_resolution():
     del TypeEngine._REGISTRY[MyInt]
 
 
-def test_task_annotate_primitive_type_is_allowed():
+def test_task_annotate_primitive_type_is_allowed(flyte_ctx):
     @task
     def plus_two(
         a: int,
@@ -1820,7 +1782,7 @@ def test_task_annotate_primitive_type_is_allowed():
 
     assert plus_two(a=1) == 3
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
     output_lm = plus_two.dispatch_execute(
         ctx,
         _literal_models.LiteralMap(
@@ -1835,7 +1797,8 @@ def test_task_annotate_primitive_type_is_allowed():
     assert output_lm.literals["o0"].hash == "6"
 
 
-def test_task_hash_return_pandas_dataframe():
+@pytest.mark.io
+def test_task_hash_return_pandas_dataframe(flyte_ctx):
     constant_value = "road-hash"
 
     def constant_function(df: pandas.DataFrame) -> str:
@@ -1845,7 +1808,7 @@ def test_task_hash_return_pandas_dataframe():
     def t0() -> Annotated[pandas.DataFrame, HashMethod(constant_function)]:
         return pandas.DataFrame(data={"col1": [1, 2], "col2": [3, 4]})
 
-    ctx = context_manager.FlyteContextManager.current_context()
+    ctx = flyte_ctx
     output_lm = t0.dispatch_execute(ctx, _literal_models.LiteralMap(literals={}))
     assert output_lm.literals["o0"].hash == constant_value
 
@@ -1855,6 +1818,7 @@ def test_task_hash_return_pandas_dataframe():
     assert df.equals(expected_df)
 
 
+@pytest.mark.io
 def test_workflow_containing_multiple_annotated_tasks():
     def hash_function_t0(df: pandas.DataFrame) -> str:
         return "hash-0"
@@ -1893,6 +1857,7 @@ def test_workflow_containing_multiple_annotated_tasks():
     assert expected_df.equals(df)
 
 
+@pytest.mark.io
 def test_list_containing_multiple_annotated_pandas_dataframes():
     def hash_pandas_dataframe(df: pandas.DataFrame) -> str:
         return str(pandas.util.hash_pandas_object(df))
@@ -1,3 +1,5 @@
+import copy
+
 from flytekit.models.core import identifier
 
 
@@ -70,3 +72,15 @@ def test_identifier_emptiness():
     assert empty_id.is_empty
     assert not not_empty_id.is_empty
     assert not_empty_id.resource_type_name() == "UNSPECIFIED"
+
+
+def test_identifier_interning():
+    obj = identifier.Identifier(identifier.ResourceType.TASK, "project", "domain", "name", "version")
+    assert identifier.Identifier(identifier.ResourceType.TASK, "project", "domain", "name", "version") is obj
+    assert identifier.Identifier.from_flyte_idl(obj.to_flyte_idl()) is obj
+    assert identifier.Identifier(identifier.ResourceType.WORKFLOW, "project", "domain", "name", "version") is not obj
+
+    obj2 = copy.deepcopy(obj)
+    assert obj2 is not obj
+    assert obj2 == obj
+    assert hash(obj2) == hash(obj)
@@ -1,6 +1,19 @@
+import gzip
+import hashlib
+import io
 import os
+import tarfile
 
-from flytekit.tools.script_mode import compress_single_script, hash_file
+import mock
+import pytest
+
+from flytekit.tools import script_mode
+from flytekit.tools.script_mode import (
+    _hash_file,
+    compress_single_script,
+    hash_file,
+    hash_files,
+)
 
 WORKFLOW = """
 @workflow
@@ -29,7 +42,170 @@ def test_deterministic_hash(tmp_path):
     # Try again to assert digest determinism
     destination2 = tmp_path / "destination2"
     compress_single_script(workflows_dir, destination2, "hello_world")
-    digest2, hex_digest2 = hash_file(destination)
+    digest2, hex_digest2 = hash_file(destination2)
 
     assert digest == digest2
     assert hex_digest == hex_digest2
+
+
+def test_hash_file_picks_up_changes(tmp_path):
+    f = tmp_path / "hello_world.py"
+    f.write_text(WORKFLOW)
+    digest, _ = hash_file(f)
+    assert hash_file(str(f))[0] == digest
+
+    f.write_text(WORKFLOW + "\n# changed")
+    assert hash_file(f)[0] != digest
+
+
+def test_hash_file_same_size_rewrite(tmp_path):
+    f = tmp_path / "hello_world.py"
+    f.write_text(WORKFLOW)
+    stat = os.stat(f)
+    digest, _ = hash_file(f)
+
+    # Rewrite with the same size and put the mtime back, as a filesystem with coarse timestamps would
+    f.write_text(WORKFLOW.upper())
+    os.utime(f, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert hash_file(f)[0] != digest
+
+
+def test_hash_file_cache(tmp_path):
+    f = tmp_path / "hello_world.py"
+    f.write_text(WORKFLOW)
+    # Only files modified a while ago are cached
+    os.utime(f, ns=(0, 10**18))
+    _hash_file.cache_clear()
+
+    digest, _ = hash_file(f)
+    assert hash_file(f)[0] == digest
+    assert _hash_file.cache_info().hits == 1
+    assert _hash_file.cache_info().misses == 1
+
+    f.write_text(WORKFLOW + "\n# changed")
+    os.utime(f, ns=(0, 10**18))
+    assert hash_file(f)[0] != digest
+    assert _hash_file.cache_info().misses == 2
+
+    os.utime(f, ns=(0, 10**18 + 1))
+    hash_file(f)
+    assert _hash_file.cache_info().misses == 3
+
+
+def test_hash_file_without_mmap(tmp_path, monkeypatch):
+    f = tmp_path / "hello_world.py"
+    f.write_text(WORKFLOW)
+    # Take the pre-3.11 path on every interpreter, so the readinto fallback is what computes the digest
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    with mock.patch("flytekit.tools.script_mode.mmap.mmap", side_effect=OSError) as mock_mmap:
+        assert hash_file(f)[1] == hashlib.md5(WORKFLOW.encode()).hexdigest()
+    mock_mmap.assert_called_once()
+
+
+def test_hash_file_empty(tmp_path):
+    f = tmp_path / "empty.py"
+    f.touch()
+    assert hash_file(f)[1] == "d41d8cd98f00b204e9800998ecf8427e"
+
+
+def test_compress_single_script_layout(tmp_path):
+    workflows_dir = tmp_path / "flyte" / "workflows"
+    workflows_dir.mkdir(parents=True)
+    open(tmp_path / "flyte" / "__init__.py", "a").close()
+    open(workflows_dir / "__init__.py", "a").close()
+    (workflows_dir / "example.py").write_text(WORKFLOW)
+    (workflows_dir / "another_example.py").write_text(WORKFLOW)
+    os.chmod(workflows_dir / "example.py", 0o600)
+
+    destination = tmp_path / "destination"
+    compress_single_script(tmp_path, destination, "flyte.workflows.example")
+
+    with tarfile.open(destination, "r:gz") as tar:
+        assert tar.getnames() == [
+            "flyte",
+            "flyte/__init__.py",
+            "flyte/workflows",
+            "flyte/workflows/__init__.py",
+            "flyte/workflows/example.py",
+        ]
+        assert tar.extractfile("flyte/workflows/example.py").read().decode() == WORKFLOW
+        for member in tar.getmembers():
+            assert member.mode == (0o755 if member.isdir() else 0o644)
+
+
+def test_compress_single_script_long_names(tmp_path):
+    # Deep enough to go over the 255 byte path and 100 byte name limits of plain ustar
+    pkgs = [f"package_{i}_" + "x" * 50 for i in range(5)]
+    package_dir = tmp_path.joinpath(*pkgs)
+    package_dir.mkdir(parents=True)
+    for i in range(len(pkgs)):
+        open(tmp_path.joinpath(*pkgs[: i + 1]) / "__init__.py", "a").close()
+    script_name = "workflow_" + "y" * 100
+    (package_dir / f"{script_name}.py").write_text(WORKFLOW)
+
+    destination = tmp_path / "destination"
+    compress_single_script(tmp_path, destination, ".".join(pkgs + [script_name]))
+
+    script_path = "/".join(pkgs + [f"{script_name}.py"])
+    with tarfile.open(destination, "r:gz") as tar:
+        assert tar.getnames()[-1] == script_path
+        assert tar.extractfile(script_path).read().decode() == WORKFLOW
+
+
+def test_compress_single_script_in_memory(tmp_path):
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    (workflows_dir / "hello_world.py").write_text(WORKFLOW)
+
+    buf = io.BytesIO()
+    compress_single_script(workflows_dir, buf, "hello_world")
+
+    buf.seek(0)
+    with tarfile.open(fileobj=buf, mode="r:gz") as tar:
+        assert tar.getnames() == ["hello_world.py"]
+
+
+def test_compress_single_script_gzip_implementation(tmp_path, monkeypatch):
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    (workflows_dir / "hello_world.py").write_text(WORKFLOW)
+
+    gzip_file = mock.MagicMock(wraps=gzip.GzipFile)
+    monkeypatch.setattr(script_mode, "_gzip", mock.MagicMock(GzipFile=gzip_file))
+    destination = tmp_path / "destination"
+    compress_single_script(workflows_dir, destination, "hello_world")
+
+    gzip_file.assert_called_once()
+    with tarfile.open(destination, "r:gz") as tar:
+        assert tar.getnames() == ["hello_world.py"]
+
+
+def test_compress_single_script_isal(tmp_path, monkeypatch):
+    igzip = pytest.importorskip("isal.igzip")
+    monkeypatch.setattr(script_mode, "_gzip", igzip)
+    workflows_dir = tmp_path / "workflows"
+    workflows_dir.mkdir()
+    (workflows_dir / "hello_world.py").write_text(WORKFLOW)
+
+    destination = tmp_path / "destination"
+    compress_single_script(workflows_dir, destination, "hello_world")
+    destination2 = tmp_path / "destination2"
+    compress_single_script(workflows_dir, destination2, "hello_world")
+
+    # Still a regular gzip file, and deterministic for a given gzip implementation
+    assert destination.read_bytes() == destination2.read_bytes()
+    with tarfile.open(destination, "r:gz") as tar:
+        assert tar.extractfile("hello_world.py").read().decode() == WORKFLOW
+
+
+def test_hash_files(tmp_path):
+    paths = []
+    for i in range(3):
+        f = tmp_path / f"wf_{i}.py"
+        f.write_text(WORKFLOW * (i + 1))
+        paths.append(f)
+
+    digests = hash_files(paths)
+    assert list(digests.keys()) == paths
+    for p in paths:
+        assert digests[p] == hash_file(p)